@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import json
-from typing import Any, MutableMapping, MutableSequence
+import math
+import sys
+from typing import Any, Iterable, MutableMapping, MutableSequence, Sequence
 
 import asyncpg
+import orjson
+from cachetools import Cache, LRUCache
+from cachetools.keys import hashkey
 from importlib_resources import files
 from streamflow.core import utils
 from streamflow.core.asyncache import cachedmethod
@@ -12,10 +20,84 @@ from streamflow.core.deployment import Target
 from streamflow.core.persistence import DependencyType
 from streamflow.core.utils import get_date_from_ns
 from streamflow.core.workflow import Port, Status, Step, Token
+from streamflow.log_handler import logger
 from streamflow.persistence.base import CachedDatabase
 
 
+def _has_non_finite(obj: Any) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    elif isinstance(obj, dict):
+        return any(_has_non_finite(v) for v in obj.values())
+    elif isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    else:
+        return False
+
+
+def _json_dumps(obj: Any, allow_nan: bool = True) -> str:
+    # orjson silently writes NaN and Infinity as null, so leave them to json
+    if _has_non_finite(obj):
+        return json.dumps(obj, allow_nan=allow_nan)
+    try:
+        return orjson.dumps(obj).decode("utf-8")
+    except TypeError:
+        # orjson rejects non-string keys and subclasses of some builtin types
+        return json.dumps(obj)
+
+
+_INPUT_DEPENDENCY: int = DependencyType.INPUT.value
+_OUTPUT_DEPENDENCY: int = DependencyType.OUTPUT.value
+_SCHEMA_JSON: str = (
+    files(__package__)
+    .joinpath("schemas")
+    .joinpath("postgresql.json")
+    .read_text("utf-8")
+)
+_SCHEMA_SQL: str = (
+    files(__package__).joinpath("schemas").joinpath("postgresql.sql").read_text("utf-8")
+)
+# The digest of the applied DDL is stamped as a comment on the workflow table
+_SCHEMA_DIGEST: str = hashlib.sha256(_SCHEMA_SQL.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_class_fullname(cls: type) -> str:
+    return utils.get_class_fullname(cls)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_insert_many_query(
+    table: str, columns: tuple[str, ...], casts: tuple[str, ...]
+) -> str:
+    return "INSERT INTO {}(id, {}) SELECT * FROM unnest({})".format(  # nosec
+        table,
+        ", ".join(columns),
+        ", ".join(
+            [f"${i + 1}::{cast}[]" for i, cast in enumerate(("integer", *casts))]
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _get_update_query(table: str, keys: tuple[str, ...]) -> str:
+    return "UPDATE {} SET {} WHERE id = $1".format(  # nosec
+        table, ", ".join([f"{k} = ${i + 2}" for i, k in enumerate(keys)])
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _get_bulk_update_query(table: str, keys: tuple[str, ...]) -> str:
+    return (  # nosec
+        "UPDATE {table} SET {} "
+        "FROM jsonb_populate_recordset(NULL::{table}, $1::jsonb) AS v "
+        "WHERE {table}.id = v.id"
+    ).format(", ".join([f"{k} = v.{k}" for k in keys]), table=table)
+
+
 class PostgreSQLConnectionPool:
+    _pools: MutableMapping[tuple[Any, ...], PostgreSQLConnectionPool] = {}
+
     def __init__(
         self,
         dbname: str,
@@ -23,43 +105,125 @@ class PostgreSQLConnectionPool:
         username: str,
         password: str,
         timeout: int,
-        maxsize: int = 10,
+        minsize: int = 4,
+        maxsize: int = 20,
+        max_queries: int = 50000,
+        max_inactive_lifetime: float = 300.0,
+        statement_cache_size: int = 1024,
+        keepalives_idle: int = 0,
     ):
         self.dbname: str = dbname
         self.hostname: str = hostname
         self.username: str = username
         self.password: str = password
         self.timeout: int = timeout
+        self.minsize: int = minsize
         self.maxsize: int = maxsize
+        self.max_queries: int = max_queries
+        self.max_inactive_lifetime: float = max_inactive_lifetime
+        self.statement_cache_size: int = statement_cache_size
+        self.keepalives_idle: int = keepalives_idle
+        try:
+            self._loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        self._key: tuple[Any, ...] = (
+            self._loop,
+            dbname,
+            hostname,
+            username,
+            hashlib.sha256(password.encode("utf-8")).hexdigest(),
+            timeout,
+            minsize,
+            maxsize,
+            max_queries,
+            max_inactive_lifetime,
+            statement_cache_size,
+            keepalives_idle,
+        )
+        self._lock: asyncio.Lock | None = None
         self._pool: asyncpg.Pool | None = None
+        self._refcount: int = 0
 
-    async def __aenter__(self):
-        if not self._pool:
-            self._pool = await asyncpg.create_pool(
-                database=self.dbname,
-                user=self.username,
-                password=self.password,
-                host=self.hostname,
-                timeout=self.timeout,
-                max_size=self.maxsize,
-            )
-            async with self._pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        files(__package__)
-                        .joinpath("schemas")
-                        .joinpath("postgresql.sql")
-                        .read_text("utf-8")
+    @classmethod
+    def get_or_create(cls, *args, **kwargs) -> PostgreSQLConnectionPool:
+        # Databases with the same configuration share a single set of connections,
+        # as long as they live in the same event loop, which asyncpg pools are bound to
+        for key in [k for k, p in cls._pools.items() if p._loop.is_closed()]:
+            del cls._pools[key]
+        pool = cls(*args, **kwargs)
+        if pool._loop is not None:
+            pool = cls._pools.setdefault(pool._key, pool)
+        pool._refcount += 1
+        return pool
+
+    async def close(self):
+        self._refcount = max(self._refcount - 1, 0)
+        if self._refcount == 0:
+            if self._pools.get(self._key) is self:
+                del self._pools[self._key]
+            if self._pool:
+                await self._pool.close()
+                self._pool = None
+
+    async def connect(self) -> asyncpg.Pool:
+        if self._pool is None:
+            if self._lock is None:
+                # Create the lock in the running loop, as Python < 3.10 binds it early
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._pool is None:
+                    pool = await asyncpg.create_pool(
+                        database=self.dbname,
+                        user=self.username,
+                        password=self.password,
+                        host=self.hostname,
+                        timeout=self.timeout,
+                        min_size=min(self.minsize, self.maxsize),
+                        max_size=self.maxsize,
+                        max_queries=self.max_queries,
+                        max_inactive_connection_lifetime=self.max_inactive_lifetime,
+                        statement_cache_size=self.statement_cache_size,
+                        server_settings=(
+                            {"tcp_keepalives_idle": str(self.keepalives_idle)}
+                            if self.keepalives_idle > 0
+                            else None
+                        ),
                     )
+                    try:
+                        async with pool.acquire() as conn:
+                            await self._create_schema(conn)
+                    except BaseException:
+                        # Do not leak the pool connections when the schema fails
+                        pool.terminate()
+                        raise
+                    self._pool = pool
         return self._pool
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        pass
-
-    async def close(self):
-        if self._pool:
-            await self._pool.close()
-            self._pool = None
+    async def _create_schema(self, conn: asyncpg.Connection) -> None:
+        query = "SELECT obj_description(to_regclass('workflow'), 'pg_class')"
+        if _SCHEMA_DIGEST != await conn.fetchval(query):
+            async with conn.transaction():
+                # Serialise concurrent migrations and skip those already applied
+                await conn.execute(
+                    "SELECT pg_advisory_xact_lock(hashtext('streamflow'))"
+                )
+                if _SCHEMA_DIGEST == await conn.fetchval(query):
+                    return
+                # Only the owner can migrate existing tables: other roles use them as-is
+                if await conn.fetchval(
+                    "SELECT NOT pg_has_role(relowner, 'USAGE') "
+                    "FROM pg_class WHERE oid = to_regclass('workflow')"
+                ):
+                    logger.warning(
+                        f"Database {self.dbname} has an outdated schema, "
+                        f"but user {self.username} does not own it and cannot migrate it"
+                    )
+                    return
+                await conn.execute(_SCHEMA_SQL)
+                await conn.execute(
+                    f"COMMENT ON TABLE workflow IS '{_SCHEMA_DIGEST}'"  # nosec
+                )
 
 
 class PostgreSQLDatabase(CachedDatabase):
@@ -71,45 +235,132 @@ class PostgreSQLDatabase(CachedDatabase):
         username: str,
         password: str,
         timeout: int = 20,
-        maxConnections: int = 10,
+        minConnections: int = 4,
+        maxConnections: int = 20,
+        maxQueries: int = 50000,
+        maxInactiveConnectionLifetime: float = 300.0,
+        statementCacheSize: int = 1024,
+        keepalivesIdle: int = 0,
     ):
         super().__init__(context)
-        self.pool: PostgreSQLConnectionPool = PostgreSQLConnectionPool(
+        self.pool: PostgreSQLConnectionPool = PostgreSQLConnectionPool.get_or_create(
             dbname=dbname,
             hostname=hostname,
             username=username,
             password=password,
             timeout=timeout,
+            minsize=minConnections,
             maxsize=maxConnections,
+            max_queries=maxQueries,
+            max_inactive_lifetime=maxInactiveConnectionLifetime,
+            statement_cache_size=statementCacheSize,
+            keepalives_idle=keepalivesIdle,
         )
+        self.input_ports_cache: Cache = LRUCache(maxsize=sys.maxsize)
+        self.input_steps_cache: Cache = LRUCache(maxsize=sys.maxsize)
+        self.output_ports_cache: Cache = LRUCache(maxsize=sys.maxsize)
+        self.output_steps_cache: Cache = LRUCache(maxsize=sys.maxsize)
+        self._closed: bool = False
+
+    async def _get_rows(
+        self, table: str, cache: Cache, ids: Iterable[int]
+    ) -> MutableMapping[int, MutableMapping[str, Any]]:
+        # Serve cached rows and fetch all the missing ones with a single query
+        rows = {}
+        missing = []
+        for row_id in ids:
+            if (key := hashkey(row_id)) in cache:
+                rows[row_id] = cache[key]
+            else:
+                missing.append(row_id)
+        if missing:
+            async with (await self.pool.connect()).acquire() as conn:
+                for row in await conn.fetch(
+                    f"SELECT * FROM {table} WHERE id = ANY($1::integer[])",  # nosec
+                    missing,
+                ):
+                    rows[row["id"]] = cache[hashkey(row["id"])] = row
+        return rows
+
+    async def _insert_many(
+        self,
+        table: str,
+        columns: tuple[str, ...],
+        casts: tuple[str, ...],
+        rows: Sequence[Sequence[Any]],
+    ) -> MutableSequence[int]:
+        if not rows:
+            return []
+        async with (await self.pool.connect()).acquire() as conn:
+            # Neither unnest nor RETURNING guarantee any order, so ids are reserved
+            # upfront and paired with the rows explicitly
+            ids = [
+                row["id"]
+                for row in await conn.fetch(
+                    "SELECT nextval(pg_get_serial_sequence($1, 'id')) AS id "
+                    "FROM generate_series(1, $2)",
+                    table,
+                    len(rows),
+                )
+            ]
+            # Each column is sent as a single array and unnested back into rows
+            await conn.execute(
+                _get_insert_many_query(table, columns, casts),
+                ids,
+                *(list(values) for values in zip(*rows)),
+            )
+            return ids
+
+    def _evict_dependency(self, step: int, port: int, type: DependencyType) -> None:
+        if type == DependencyType.INPUT:
+            self.input_ports_cache.pop(hashkey(step), None)
+            self.output_steps_cache.pop(hashkey(port), None)
+        else:
+            self.output_ports_cache.pop(hashkey(step), None)
+            self.input_steps_cache.pop(hashkey(port), None)
 
     async def close(self):
-        await self.pool.close()
+        # The pool may be shared, so release this database's reference only once
+        if not self._closed:
+            self._closed = True
+            await self.pool.close()
 
     @classmethod
     def get_schema(cls):
-        return (
-            files(__package__)
-            .joinpath("schemas")
-            .joinpath("postgresql.json")
-            .read_text("utf-8")
-        )
+        return _SCHEMA_JSON
 
     async def add_dependency(
         self, step: int, port: int, type: DependencyType, name: str
     ) -> None:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "INSERT INTO dependency(step, port, type, name) "
-                        "VALUES($1, $2, $3, $4) "
-                        "ON CONFLICT DO NOTHING",
-                        step,
-                        port,
-                        type.value,
-                        name,
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                "INSERT INTO dependency(step, port, type, name) "
+                "VALUES($1, $2, $3, $4) "
+                "ON CONFLICT DO NOTHING",
+                step,
+                port,
+                type.value,
+                name,
+            )
+            self._evict_dependency(step, port, type)
+
+    async def add_dependencies(
+        self, step: int, dependencies: Iterable[tuple[int, DependencyType, str]]
+    ) -> None:
+        if not (dependencies := list(dependencies)):
+            return
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                "INSERT INTO dependency(step, port, type, name) "
+                "SELECT $1, * FROM unnest($2::integer[], $3::integer[], $4::text[]) "
+                "ON CONFLICT DO NOTHING",
+                step,
+                [port for port, _, _ in dependencies],
+                [type.value for _, type, _ in dependencies],
+                [name for _, _, name in dependencies],
+            )
+        for port, type, _ in dependencies:
+            self._evict_dependency(step, port, type)
 
     async def add_deployment(
         self,
@@ -121,47 +372,51 @@ class PostgreSQLDatabase(CachedDatabase):
         workdir: str | None,
         wraps: MutableMapping[str, Any] | None,
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO deployment(name, type, config, external, lazy, workdir, wraps) "
-                        "VALUES ($1, $2, $3, $4, $5, $6, $7) "
-                        "RETURNING id",
-                        name,
-                        type,
-                        config,
-                        external,
-                        lazy,
-                        workdir,
-                        json.dumps(wraps),
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO deployment(name, type, config, external, lazy, workdir, wraps) "
+                "VALUES ($1, $2, $3, $4, $5, $6, $7) "
+                "RETURNING id",
+                name,
+                type,
+                config,
+                external,
+                lazy,
+                workdir,
+                _json_dumps(wraps),
+            )
 
     async def add_execution(self, step_id: int, tag: str, cmd: str) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO execution(step, tag, cmd) "
-                        "VALUES($1, $2, $3) "
-                        "RETURNING id",
-                        step_id,
-                        tag,
-                        cmd.encode("utf-8"),
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO execution(step, tag, cmd) "
+                "VALUES($1, $2, $3) "
+                "RETURNING id",
+                step_id,
+                tag,
+                cmd,
+            )
+
+    async def add_executions(
+        self, executions: MutableSequence[tuple[int, str, str]]
+    ) -> MutableSequence[int]:
+        return await self._insert_many(
+            "execution",
+            ("step", "tag", "cmd"),
+            ("integer", "text", "text"),
+            executions,
+        )
 
     async def add_filter(self, name: str, type: str, config: str) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO filter(name, type, config) "
-                        "VALUES($1, $2, $3) "
-                        "RETURNING id",
-                        name,
-                        type,
-                        config,
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO filter(name, type, config) "
+                "VALUES($1, $2, $3) "
+                "RETURNING id",
+                name,
+                type,
+                config,
+            )
 
     async def add_port(
         self,
@@ -170,29 +425,40 @@ class PostgreSQLDatabase(CachedDatabase):
         type: type[Port],
         params: MutableMapping[str, Any],
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO port(name, workflow, type, params) "
-                        "VALUES($1, $2, $3, $4) "
-                        "RETURNING id",
-                        name,
-                        workflow_id,
-                        utils.get_class_fullname(type),
-                        json.dumps(params),
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO port(name, workflow, type, params) "
+                "VALUES($1, $2, $3, $4) "
+                "RETURNING id",
+                name,
+                workflow_id,
+                _get_class_fullname(type),
+                _json_dumps(params),
+            )
+
+    async def add_ports(
+        self,
+        ports: MutableSequence[tuple[str, int, type[Port], MutableMapping[str, Any]]],
+    ) -> MutableSequence[int]:
+        return await self._insert_many(
+            "port",
+            ("name", "workflow", "type", "params"),
+            ("text", "integer", "text", "text"),
+            [
+                (name, workflow_id, _get_class_fullname(type), _json_dumps(params))
+                for name, workflow_id, type, params in ports
+            ],
+        )
 
     async def add_provenance(self, inputs: MutableSequence[int], token: int):
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.executemany(
-                        "INSERT INTO provenance(dependee, depender) "
-                        "VALUES($1, $2) "
-                        "ON CONFLICT DO NOTHING",
-                        [(i, token) for i in inputs],
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.execute(
+                "INSERT INTO provenance(dependee, depender) "
+                "SELECT dependee, $2 FROM unnest($1::integer[]) AS dependee "
+                "ON CONFLICT DO NOTHING",
+                list(inputs),
+                token,
+            )
 
     async def add_step(
         self,
@@ -202,19 +468,39 @@ class PostgreSQLDatabase(CachedDatabase):
         type: type[Step],
         params: MutableMapping[str, Any],
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO step(name, workflow, status, type, params) "
-                        "VALUES($1, $2, $3, $4, $5) "
-                        "RETURNING id",
-                        name,
-                        workflow_id,
-                        status,
-                        utils.get_class_fullname(type),
-                        json.dumps(params),
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO step(name, workflow, status, type, params) "
+                "VALUES($1, $2, $3, $4, $5) "
+                "RETURNING id",
+                name,
+                workflow_id,
+                status,
+                _get_class_fullname(type),
+                _json_dumps(params),
+            )
+
+    async def add_steps(
+        self,
+        steps: MutableSequence[
+            tuple[str, int, int, type[Step], MutableMapping[str, Any]]
+        ],
+    ) -> MutableSequence[int]:
+        return await self._insert_many(
+            "step",
+            ("name", "workflow", "status", "type", "params"),
+            ("text", "integer", "integer", "text", "text"),
+            [
+                (
+                    name,
+                    workflow_id,
+                    status,
+                    _get_class_fullname(type),
+                    _json_dumps(params),
+                )
+                for name, workflow_id, status, type, params in steps
+            ],
+        )
 
     async def add_target(
         self,
@@ -225,408 +511,479 @@ class PostgreSQLDatabase(CachedDatabase):
         service: str | None = None,
         workdir: str | None = None,
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO target(params, type, deployment, locations, service, workdir) "
-                        "VALUES ($1, $2, $3, $4, $5, $6) "
-                        "RETURNING id",
-                        json.dumps(params),
-                        utils.get_class_fullname(type),
-                        deployment,
-                        locations,
-                        service,
-                        workdir,
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO target(params, type, deployment, locations, service, workdir) "
+                "VALUES ($1, $2, $3, $4, $5, $6) "
+                "RETURNING id",
+                _json_dumps(params),
+                _get_class_fullname(type),
+                deployment,
+                locations,
+                service,
+                workdir,
+            )
 
     async def add_token(
         self, tag: str, type: type[Token], value: Any, port: int | None = None
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO token(port, type, tag, value) "
-                        "VALUES($1, $2, $3, $4) "
-                        "RETURNING id",
-                        port,
-                        utils.get_class_fullname(type),
-                        tag,
-                        bytearray(value, "utf-8"),
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO token(port, type, tag, value) "
+                "VALUES($1, $2, $3, $4) "
+                "RETURNING id",
+                port,
+                _get_class_fullname(type),
+                tag,
+                value,
+            )
+
+    async def add_tokens(
+        self, tokens: MutableSequence[tuple[str, type[Token], Any, int | None]]
+    ) -> MutableSequence[int]:
+        if not tokens:
+            return []
+        async with (await self.pool.connect()).acquire() as conn:
+            # COPY cannot return the generated keys, so ids are reserved upfront
+            ids = [
+                row["id"]
+                for row in await conn.fetch(
+                    "SELECT nextval(pg_get_serial_sequence('token', 'id')) AS id "
+                    "FROM generate_series(1, $1)",
+                    len(tokens),
+                )
+            ]
+            await conn.copy_records_to_table(
+                "token",
+                records=[
+                    (token_id, port, _get_class_fullname(type), tag, value)
+                    for token_id, (tag, type, value, port) in zip(ids, tokens)
+                ],
+                columns=("id", "port", "type", "tag", "value"),
+            )
+            return ids
 
     async def add_workflow(
         self, name: str, params: MutableMapping[str, Any], status: int, type: str
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    return await conn.fetchval(
-                        "INSERT INTO workflow(name, params, status, type) "
-                        "VALUES($1, $2, $3, $4) "
-                        "RETURNING id",
-                        name,
-                        json.dumps(params),
-                        status,
-                        type,
-                    )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchval(
+                "INSERT INTO workflow(name, params, status, type) "
+                "VALUES($1, $2, $3, $4) "
+                "RETURNING id",
+                name,
+                _json_dumps(params),
+                status,
+                type,
+            )
 
     async def get_dependees(
         self, token_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM provenance WHERE depender = $1",
-                    token_id,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT * FROM provenance WHERE depender = $1", token_id
+            )
 
     async def get_dependers(
         self, token_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM provenance WHERE dependee = $1",
-                    token_id,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT * FROM provenance WHERE dependee = $1", token_id
+            )
 
     @cachedmethod(lambda self: self.deployment_cache)
     async def get_deployment(self, deployment_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetchrow(
-                    "SELECT * FROM deployment WHERE id = $1",
-                    deployment_id,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow(
+                "SELECT * FROM deployment WHERE id = $1", deployment_id
+            )
 
     async def get_execution(self, execution_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    "SELECT * FROM execution WHERE id = $1", execution_id
-                )
-                return {
-                    k: bytearray(v) if isinstance(v, memoryview) else v
-                    for k, v in row.items()
-                }
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow(
+                "SELECT * FROM execution WHERE id = $1", execution_id
+            )
 
     async def get_executions_by_step(
         self, step_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(
-                    "SELECT * FROM execution WHERE step = $1", step_id
-                )
-                return [
-                    {
-                        k: bytearray(v) if isinstance(v, memoryview) else v
-                        for k, v in row.items()
-                    }
-                    for row in rows
-                ]
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch("SELECT * FROM execution WHERE step = $1", step_id)
 
     @cachedmethod(lambda self: self.filter_cache)
     async def get_filter(self, filter_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetchrow(
-                    "SELECT * FROM filter WHERE id = $1",
-                    filter_id,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow("SELECT * FROM filter WHERE id = $1", filter_id)
 
+    @cachedmethod(lambda self: self.input_ports_cache)
     async def get_input_ports(
         self, step_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM dependency WHERE step = $1 AND type = $2",
-                    step_id,
-                    DependencyType.INPUT.value,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT * FROM dependency WHERE step = $1 AND type = $2",
+                step_id,
+                _INPUT_DEPENDENCY,
+            )
 
+    @cachedmethod(lambda self: self.input_steps_cache)
     async def get_input_steps(
         self, port_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM dependency WHERE port = $1 AND type = $2",
-                    port_id,
-                    DependencyType.OUTPUT.value,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT * FROM dependency WHERE port = $1 AND type = $2",
+                port_id,
+                _OUTPUT_DEPENDENCY,
+            )
 
+    @cachedmethod(lambda self: self.output_ports_cache)
     async def get_output_ports(
         self, step_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM dependency WHERE step = $1 AND type = $2",
-                    step_id,
-                    DependencyType.OUTPUT.value,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT * FROM dependency WHERE step = $1 AND type = $2",
+                step_id,
+                _OUTPUT_DEPENDENCY,
+            )
 
+    @cachedmethod(lambda self: self.output_steps_cache)
     async def get_output_steps(
         self, port_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM dependency WHERE port = $1 AND type = $2",
-                    port_id,
-                    DependencyType.INPUT.value,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT * FROM dependency WHERE port = $1 AND type = $2",
+                port_id,
+                _INPUT_DEPENDENCY,
+            )
 
     @cachedmethod(lambda self: self.port_cache)
     async def get_port(self, port_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetchrow("SELECT * FROM port WHERE id = $1", port_id)
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow("SELECT * FROM port WHERE id = $1", port_id)
+
+    async def get_ports(
+        self, port_ids: Iterable[int]
+    ) -> MutableMapping[int, MutableMapping[str, Any]]:
+        return await self._get_rows("port", self.port_cache, port_ids)
 
     async def get_port_from_token(self, token_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetchrow(
-                    "SELECT port.* "
-                    "FROM token JOIN port ON token.port = port.id"
-                    "WHERE token.id = $1",
-                    token_id,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow(
+                "SELECT port.* "
+                "FROM token JOIN port ON token.port = port.id "
+                "WHERE token.id = $1",
+                token_id,
+            )
 
     async def get_port_tokens(self, port_id: int) -> MutableSequence[int]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                rows = await conn.fetch("SELECT * FROM port WHERE id = $1", port_id)
-                return [row["id"] for row in rows]
+        async with (await self.pool.connect()).acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT id FROM token WHERE port = $1 ORDER BY id", port_id
+            )
+            return [row["id"] for row in rows]
+
+    async def get_ports_by_step(
+        self, step_id: int
+    ) -> MutableMapping[DependencyType, MutableSequence[MutableMapping[str, Any]]]:
+        key = hashkey(step_id)
+        if key in self.input_ports_cache and key in self.output_ports_cache:
+            return {
+                DependencyType.INPUT: self.input_ports_cache[key],
+                DependencyType.OUTPUT: self.output_ports_cache[key],
+            }
+        async with (await self.pool.connect()).acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM dependency WHERE step = $1", step_id)
+        # Both directions are fetched at once, so both caches can be filled
+        ports = {DependencyType.INPUT: [], DependencyType.OUTPUT: []}
+        for row in rows:
+            ports[DependencyType(row["type"])].append(row)
+        self.input_ports_cache[key] = ports[DependencyType.INPUT]
+        self.output_ports_cache[key] = ports[DependencyType.OUTPUT]
+        return ports
+
+    async def get_provenance(self, token_id: int) -> tuple[
+        MutableSequence[MutableMapping[str, Any]],
+        MutableSequence[MutableMapping[str, Any]],
+    ]:
+        async with (await self.pool.connect()).acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT * FROM provenance WHERE depender = $1 OR dependee = $1",
+                token_id,
+            )
+        return (
+            [row for row in rows if row["depender"] == token_id],
+            [row for row in rows if row["dependee"] == token_id],
+        )
 
     async def get_reports(
         self, workflow: str, last_only: bool = False
     ) -> MutableSequence[MutableSequence[MutableMapping[str, Any]]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                if last_only:
-                    rows = await conn.fetch(
-                        "SELECT c.id, s.name, c.start_time, c.end_time "
+        async with (await self.pool.connect()).acquire() as conn:
+            if last_only:
+                rows = await conn.fetch(
+                    "SELECT c.id, s.name, c.start_time, c.end_time "
+                    "FROM step AS s, execution AS c "
+                    "WHERE s.id = c.step "
+                    "AND s.workflow = ("
+                    "SELECT id FROM workflow "
+                    "WHERE name = $1 "
+                    "ORDER BY id DESC LIMIT 1) "
+                    "ORDER BY c.id",
+                    workflow,
+                )
+                return [[dict(r) for r in rows]]
+            else:
+                return [
+                    orjson.loads(row["executions"])
+                    for row in await conn.fetch(
+                        "SELECT json_agg(json_build_object("
+                        "'id', c.id, 'name', s.name, "
+                        "'start_time', c.start_time, 'end_time', c.end_time"
+                        ") ORDER BY c.id) AS executions "
                         "FROM step AS s, execution AS c "
                         "WHERE s.id = c.step "
-                        "AND s.workflow = ("
-                        "SELECT id FROM workflow "
-                        "WHERE name = $1 "
-                        "ORDER BY id DESC LIMIT 1)",
+                        "AND s.workflow IN (SELECT id FROM workflow WHERE name = $1) "
+                        "GROUP BY s.workflow "
+                        "ORDER BY s.workflow DESC",
                         workflow,
                     )
-                    return [[dict(r) for r in rows]]
-                else:
-                    async with conn.transaction():
-                        cursor = conn.cursor(
-                            "SELECT s.workflow, c.id, s.name, c.start_time, c.end_time "
-                            "FROM step AS s, execution AS c "
-                            "WHERE s.id = c.step "
-                            "AND s.workflow IN (SELECT id FROM workflow WHERE name = $1) "
-                            "ORDER BY s.workflow DESC",
-                            workflow,
-                        )
-                        result = {}
-                        async for row in cursor:
-                            result.setdefault(row["workflow"], []).append(
-                                {k: row[k] for k in row.keys() if k != "workflow"}
-                            )
-                        return list(result.values())
+                ]
 
     @cachedmethod(lambda self: self.step_cache)
     async def get_step(self, step_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetchrow("SELECT * FROM step WHERE id = $1", step_id)
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow("SELECT * FROM step WHERE id = $1", step_id)
+
+    async def get_step_bundle(self, step_id: int) -> tuple[
+        MutableMapping[str, Any],
+        MutableSequence[MutableMapping[str, Any]],
+        MutableSequence[MutableMapping[str, Any]],
+    ]:
+        step, ports = await asyncio.gather(
+            self.get_step(step_id), self.get_ports_by_step(step_id)
+        )
+        return step, ports[DependencyType.INPUT], ports[DependencyType.OUTPUT]
+
+    async def get_steps(
+        self, step_ids: Iterable[int]
+    ) -> MutableMapping[int, MutableMapping[str, Any]]:
+        return await self._get_rows("step", self.step_cache, step_ids)
+
+    async def get_step_summary(self, step_id: int) -> MutableMapping[str, Any]:
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow(
+                "SELECT id, name, workflow, status, type FROM step WHERE id = $1",
+                step_id,
+            )
 
     @cachedmethod(lambda self: self.target_cache)
     async def get_target(self, target_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetchrow(
-                    "SELECT * FROM target WHERE id = $1", target_id
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow("SELECT * FROM target WHERE id = $1", target_id)
 
     @cachedmethod(lambda self: self.token_cache)
     async def get_token(self, token_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                row = await conn.fetchrow("SELECT * FROM token WHERE id = $1", token_id)
-                return {
-                    k: bytearray(v) if isinstance(v, memoryview) else v
-                    for k, v in row.items()
-                }
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow("SELECT * FROM token WHERE id = $1", token_id)
 
+    async def get_tokens(
+        self, token_ids: Iterable[int]
+    ) -> MutableMapping[int, MutableMapping[str, Any]]:
+        return await self._get_rows("token", self.token_cache, token_ids)
+
+    @cachedmethod(lambda self: self.workflow_cache)
     async def get_workflow(self, workflow_id: int) -> MutableMapping[str, Any]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetchrow(
-                    "SELECT * FROM workflow WHERE id = $1", workflow_id
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetchrow(
+                "SELECT * FROM workflow WHERE id = $1", workflow_id
+            )
 
     async def get_workflow_ports(
         self, workflow_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM port WHERE workflow = $1",
-                    workflow_id,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT id, name, workflow, type FROM port WHERE workflow = $1",
+                workflow_id,
+            )
 
     async def get_workflow_steps(
         self, workflow_id: int
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                return await conn.fetch(
-                    "SELECT * FROM step WHERE workflow = $1",
-                    workflow_id,
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            return await conn.fetch(
+                "SELECT id, name, workflow, status, type FROM step WHERE workflow = $1",
+                workflow_id,
+            )
 
     async def get_workflows_by_name(
         self, workflow_name: str, last_only: bool = False
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                query = "SELECT * FROM workflow WHERE name = $1 ORDER BY id desc"
-                return (
-                    [conn.fetchrow(query, workflow_name)]
-                    if last_only
-                    else conn.fetch(query, workflow_name)
-                )
+        async with (await self.pool.connect()).acquire() as conn:
+            query = "SELECT * FROM workflow WHERE name = $1 ORDER BY id DESC"
+            return (
+                [await conn.fetchrow(query + " LIMIT 1", workflow_name)]
+                if last_only
+                else await conn.fetch(query, workflow_name)
+            )
 
     async def get_workflows_list(
         self, name: str | None
     ) -> MutableSequence[MutableMapping[str, Any]]:
-        if name is not None:
-            return [
-                {
-                    "end_time": get_date_from_ns(row["end_time"]),
-                    "start_time": get_date_from_ns(row["start_time"]),
-                    "status": Status(row["status"]).name,
-                    "type": row["type"],
-                }
-                for row in await self.get_workflows_by_name(name, last_only=False)
-            ]
-        else:
-            async with self.pool as pool:
-                async with pool.acquire() as conn:
-                    return await conn.fetch(
-                        "SELECT name, type, COUNT(*) AS num "
-                        "FROM workflow GROUP BY name, type "
-                        "ORDER BY name DESC"
+        async with (await self.pool.connect()).acquire() as conn:
+            if name is not None:
+                return [
+                    {
+                        "end_time": get_date_from_ns(row["end_time"]),
+                        "start_time": get_date_from_ns(row["start_time"]),
+                        "status": Status(row["status"]).name,
+                        "type": row["type"],
+                    }
+                    for row in await conn.fetch(
+                        "SELECT type, status, start_time, end_time "
+                        "FROM workflow WHERE name = $1 "
+                        "ORDER BY id DESC",
+                        name,
+                    )
+                ]
+            else:
+                return await conn.fetch(
+                    "SELECT name, type, COUNT(*) AS num "
+                    "FROM workflow GROUP BY name, type "
+                    "ORDER BY name DESC"
+                )
+
+    async def restore(
+        self, table: str, columns: Sequence[str], records: Iterable[Sequence[Any]]
+    ) -> None:
+        records = list(records)
+        if not records:
+            return
+        async with (await self.pool.connect()).acquire() as conn:
+            async with conn.transaction():
+                await conn.copy_records_to_table(
+                    table, records=records, columns=list(columns)
+                )
+                if "id" in columns:
+                    # Explicit ids do not advance the serial sequence of the table
+                    index = list(columns).index("id")
+                    await conn.execute(
+                        "SELECT setval(s::regclass, GREATEST(nextval(s::regclass), $2)) "
+                        "FROM pg_get_serial_sequence($1, 'id') AS s",
+                        table,
+                        max(record[index] for record in records),
+                    )
+
+    async def _update_rows(
+        self,
+        table: str,
+        cache: Cache,
+        updates: MutableMapping[int, MutableMapping[str, Any]],
+    ) -> MutableSequence[int]:
+        # Rows updated with the same set of columns share a single statement
+        groups = {}
+        for row_id, row_updates in updates.items():
+            groups.setdefault(tuple(row_updates), []).append(
+                {"id": row_id, **row_updates}
+            )
+        async with (await self.pool.connect()).acquire() as conn:
+            async with conn.transaction():
+                for keys, rows in groups.items():
+                    # PostgreSQL jsonb has no representation for NaN and Infinity
+                    await conn.fetch(
+                        _get_bulk_update_query(table, keys),
+                        _json_dumps(rows, allow_nan=False),
                     )
+        for row_id in updates:
+            cache.pop(hashkey(row_id), None)
+        return list(updates)
 
     async def update_deployment(
         self, deployment_id: int, updates: MutableMapping[str, Any]
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "UPDATE deployment SET {} WHERE id = $1".format(  # nosec
-                            ", ".join([f"{k} = ${i+2}" for i, k in enumerate(updates)])
-                        ),
-                        deployment_id,
-                        *updates.values(),
-                    )
-                    self.deployment_cache.pop(deployment_id, None)
-                    return deployment_id
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                _get_update_query("deployment", tuple(updates)),
+                deployment_id,
+                *updates.values(),
+            )
+            self.deployment_cache.pop(hashkey(deployment_id), None)
+            return deployment_id
 
     async def update_execution(
         self, execution_id: int, updates: MutableMapping[str, Any]
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "UPDATE execution SET {} WHERE id = $1".format(  # nosec
-                            ", ".join([f"{k} = ${i+2}" for i, k in enumerate(updates)])
-                        ),
-                        execution_id,
-                        *updates.values(),
-                    )
-                    return execution_id
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                _get_update_query("execution", tuple(updates)),
+                execution_id,
+                *updates.values(),
+            )
+            return execution_id
 
     async def update_filter(
         self, filter_id: int, updates: MutableMapping[str, Any]
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "UPDATE filter SET {} WHERE id = $1".format(  # nosec
-                            ", ".join(
-                                [f"{k} = ${i + 2}" for i, k in enumerate(updates)]
-                            )
-                        ),
-                        filter_id,
-                        *updates.values(),
-                    )
-                    self.filter_cache.pop(filter_id, None)
-                    return filter_id
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                _get_update_query("filter", tuple(updates)),
+                filter_id,
+                *updates.values(),
+            )
+            self.filter_cache.pop(hashkey(filter_id), None)
+            return filter_id
 
     async def update_port(self, port_id: int, updates: MutableMapping[str, Any]) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "UPDATE port SET {} WHERE id = $1".format(  # nosec
-                            ", ".join([f"{k} = ${i+2}" for i, k in enumerate(updates)])
-                        ),
-                        port_id,
-                        *updates.values(),
-                    )
-                    self.port_cache.pop(port_id, None)
-                    return port_id
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                _get_update_query("port", tuple(updates)), port_id, *updates.values()
+            )
+            self.port_cache.pop(hashkey(port_id), None)
+            return port_id
+
+    async def update_ports(
+        self, updates: MutableMapping[int, MutableMapping[str, Any]]
+    ) -> MutableSequence[int]:
+        return await self._update_rows("port", self.port_cache, updates)
 
     async def update_step(self, step_id: int, updates: MutableMapping[str, Any]) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "UPDATE step SET {} WHERE id = $1".format(  # nosec
-                            ", ".join([f"{k} = ${i+2}" for i, k in enumerate(updates)])
-                        ),
-                        step_id,
-                        *updates.values(),
-                    )
-                    self.step_cache.pop(step_id, None)
-                    return step_id
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                _get_update_query("step", tuple(updates)), step_id, *updates.values()
+            )
+            self.step_cache.pop(hashkey(step_id), None)
+            return step_id
+
+    async def update_steps(
+        self, updates: MutableMapping[int, MutableMapping[str, Any]]
+    ) -> MutableSequence[int]:
+        return await self._update_rows("step", self.step_cache, updates)
 
     async def update_target(
         self, target_id: int, updates: MutableMapping[str, Any]
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "UPDATE target SET {} WHERE id = $1".format(  # nosec
-                            ", ".join([f"{k} = ${i+2}" for i, k in enumerate(updates)])
-                        ),
-                        target_id,
-                        *updates.values(),
-                    )
-                    self.target_cache.pop(target_id, None)
-                    return target_id
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                _get_update_query("target", tuple(updates)),
+                target_id,
+                *updates.values(),
+            )
+            self.target_cache.pop(hashkey(target_id), None)
+            return target_id
 
     async def update_workflow(
         self, workflow_id: int, updates: MutableMapping[str, Any]
     ) -> int:
-        async with self.pool as pool:
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute(
-                        "UPDATE workflow SET {} WHERE id = $1".format(  # nosec
-                            ", ".join([f"{k} = ${i+2}" for i, k in enumerate(updates)])
-                        ),
-                        workflow_id,
-                        *updates.values(),
-                    )
-                    self.workflow_cache.pop(workflow_id, None)
-                    return workflow_id
+        async with (await self.pool.connect()).acquire() as conn:
+            await conn.fetch(
+                _get_update_query("workflow", tuple(updates)),
+                workflow_id,
+                *updates.values(),
+            )
+            self.workflow_cache.pop(hashkey(workflow_id), None)
+            return workflow_id
@@ -9,6 +9,8 @@ CREATE TABLE IF NOT EXISTS workflow
     end_time   BIGINT
 );
 
+CREATE INDEX IF NOT EXISTS workflow_name ON workflow (name, id);
+
 CREATE TABLE IF NOT EXISTS step
 (
     id       SERIAL PRIMARY KEY,
@@ -20,6 +22,8 @@ CREATE TABLE IF NOT EXISTS step
     FOREIGN KEY (workflow) REFERENCES workflow (id)
 );
 
+CREATE INDEX IF NOT EXISTS step_workflow ON step (workflow);
+
 CREATE TABLE IF NOT EXISTS port
 (
     id       SERIAL PRIMARY KEY,
@@ -30,6 +34,8 @@ CREATE TABLE IF NOT EXISTS port
     FOREIGN KEY (workflow) REFERENCES workflow (id)
 );
 
+CREATE INDEX IF NOT EXISTS port_workflow ON port (workflow);
+
 
 CREATE TABLE IF NOT EXISTS dependency
 (
@@ -42,6 +48,8 @@ CREATE TABLE IF NOT EXISTS dependency
     FOREIGN KEY (port) REFERENCES port (id)
 );
 
+CREATE INDEX IF NOT EXISTS dependency_port ON dependency (port, type);
+
 
 CREATE TABLE IF NOT EXISTS execution
 (
@@ -55,6 +63,8 @@ CREATE TABLE IF NOT EXISTS execution
     FOREIGN KEY (step) REFERENCES step (id)
 );
 
+CREATE INDEX IF NOT EXISTS execution_step ON execution (step);
+
 
 CREATE TABLE IF NOT EXISTS token
 (
@@ -62,10 +72,26 @@ CREATE TABLE IF NOT EXISTS token
     port  INTEGER,
     tag   TEXT,
     type  TEXT,
-    value BYTEA,
+    value TEXT,
     FOREIGN KEY (port) REFERENCES port (id)
 );
 
+CREATE INDEX IF NOT EXISTS token_port ON token (port, id);
+
+DO
+$$
+BEGIN
+    IF EXISTS(SELECT 1
+              FROM information_schema.columns
+              WHERE table_schema = current_schema()
+                AND table_name = 'token'
+                AND column_name = 'value'
+                AND data_type = 'bytea') THEN
+        ALTER TABLE token ALTER COLUMN value TYPE TEXT USING convert_from(value, 'UTF8');
+    END IF;
+END
+$$;
+
 
 CREATE TABLE IF NOT EXISTS provenance
 (
@@ -76,6 +102,8 @@ CREATE TABLE IF NOT EXISTS provenance
     FOREIGN KEY (depender) REFERENCES token (id)
 );
 
+CREATE INDEX IF NOT EXISTS provenance_depender ON provenance (depender);
+
 
 CREATE TABLE IF NOT EXISTS deployment
 (
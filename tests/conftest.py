@@ -16,7 +16,12 @@ from streamflow.persistence.loading_context import DefaultDatabaseLoadingContext
 
 @pytest.fixture(scope="session")
 def event_loop():
-    policy = asyncio.get_event_loop_policy()
+    try:
+        import uvloop
+
+        policy = uvloop.EventLoopPolicy()
+    except ImportError:
+        policy = asyncio.get_event_loop_policy()
     loop = policy.new_event_loop()
     yield loop
     loop.close()
@@ -57,9 +62,9 @@ async def context() -> StreamFlowContext:
 
 # The function return True if the elems are the same, otherwise False
 # The param obj_compared is useful to break a circul reference inside the objects
-# remembering the objects already encountered
+# remembering the objects already encountered in a dict indexed by their ids
 def are_equals(elem1, elem2, obj_compared=None):
-    obj_compared = obj_compared if obj_compared else []
+    obj_compared = obj_compared if obj_compared is not None else {}
 
     # if the objects are of different types, they are definitely not the same
     if type(elem1) is not type(elem2):
@@ -90,16 +95,17 @@ def are_equals(elem1, elem2, obj_compared=None):
     if dict1.keys() != dict2.keys():
         return False
 
-    # if their references are in the obj_compared list there is a circular reference to break
-    if elem1 in obj_compared:
+    # if their references are in the obj_compared dict there is a circular reference to break
+    # (the dict keeps the objects alive, so their ids cannot be reused by other objects)
+    if id(elem1) in obj_compared:
         return True
     else:
-        obj_compared.append(elem1)
+        obj_compared[id(elem1)] = elem1
 
-    if elem2 in obj_compared:
+    if id(elem2) in obj_compared:
         return True
     else:
-        obj_compared.append(elem2)
+        obj_compared[id(elem2)] = elem2
 
     # save the different values on the same attribute in the two dicts in a list:
     #   - if we find objects in the list, they must be checked recursively on their attributes
@@ -132,11 +138,10 @@ def is_primitive_type(elem):
 
 # The function given in input an object return a dictionary with attribute:value
 def object_to_dict(obj):
-    return {
-        attr: getattr(obj, attr)
-        for attr in dir(obj)
-        if not attr.startswith("__") and not callable(getattr(obj, attr))
-    }
+    attrs = (
+        (attr, getattr(obj, attr)) for attr in dir(obj) if not attr.startswith("__")
+    )
+    return {attr: value for attr, value in attrs if not callable(value)}
 
 
 async def save_load_and_test(elem: PersistableEntity, context):
@@ -1,11 +1,35 @@
+import asyncio
+import json
+import math
+import time
+
+import asyncpg
 import pytest
 
 from streamflow.core import utils
 from streamflow.core.context import StreamFlowContext
-from streamflow.core.workflow import Workflow
+from streamflow.core.persistence import DependencyType
+from streamflow.core.workflow import Status, Token, Workflow
 from streamflow.workflow.port import JobPort
 from streamflow.workflow.step import ExecuteStep
 
+from streamflow_postgresql.database import (
+    _SCHEMA_DIGEST,
+    PostgreSQLConnectionPool,
+    PostgreSQLDatabase,
+)
+
+
+def _create_database(context: StreamFlowContext, **kwargs) -> PostgreSQLDatabase:
+    return PostgreSQLDatabase(
+        context,
+        dbname=context.database.pool.dbname,
+        hostname=context.database.pool.hostname,
+        username=context.database.pool.username,
+        password=context.database.pool.password,
+        **kwargs,
+    )
+
 
 @pytest.mark.asyncio
 async def test_get_steps_queries(context: StreamFlowContext):
@@ -51,3 +75,594 @@ async def test_get_steps_queries(context: StreamFlowContext):
         ports[2].persistent_id
     )
     assert len(output_steps_port_c) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_step_bundle(context: StreamFlowContext):
+    """Test get_step_bundle query"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    ports = [workflow.create_port() for _ in range(2)]
+    job_port = workflow.create_port(JobPort)
+    step = workflow.create_step(
+        cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+    )
+    step.add_input_port("in", ports[0])
+    step.add_output_port("out", ports[1])
+    await workflow.save(context)
+
+    row, input_ports, output_ports = await context.database.get_step_bundle(
+        step.persistent_id
+    )
+    assert row["id"] == step.persistent_id
+    assert ports[0].persistent_id in {p["port"] for p in input_ports}
+    assert [p["port"] for p in output_ports] == [ports[1].persistent_id]
+
+
+@pytest.mark.asyncio
+async def test_get_step_summary(context: StreamFlowContext):
+    """Test get_step_summary query"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    job_port = workflow.create_port(JobPort)
+    step = workflow.create_step(
+        cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+    )
+    await workflow.save(context)
+
+    row = await context.database.get_step_summary(step.persistent_id)
+    assert dict(row) == {
+        "id": step.persistent_id,
+        "name": step.name,
+        "workflow": workflow.persistent_id,
+        "status": step.status.value,
+        "type": utils.get_class_fullname(ExecuteStep),
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_workflows_by_name(context: StreamFlowContext):
+    """Test get_workflows_by_name query"""
+    name = utils.random_name()
+    workflows = [
+        Workflow(context=context, type="cwl", name=name, config={}) for _ in range(2)
+    ]
+    for workflow in workflows:
+        await workflow.save(context)
+
+    rows = await context.database.get_workflows_by_name(name)
+    assert [row["id"] for row in rows] == [
+        workflows[1].persistent_id,
+        workflows[0].persistent_id,
+    ]
+    rows = await context.database.get_workflows_by_name(name, last_only=True)
+    assert len(rows) == 1
+    assert rows[0]["id"] == workflows[1].persistent_id
+
+
+@pytest.mark.asyncio
+async def test_get_workflows_list(context: StreamFlowContext):
+    """Test get_workflows_list query"""
+    name = utils.random_name()
+    workflows = [
+        Workflow(context=context, type="cwl", name=name, config={}) for _ in range(2)
+    ]
+    start_time = time.time_ns()
+    for i, (workflow, status) in enumerate(
+        zip(workflows, (Status.COMPLETED, Status.FAILED))
+    ):
+        await workflow.save(context)
+        await context.database.update_workflow(
+            workflow.persistent_id,
+            {
+                "status": status.value,
+                "start_time": start_time + i * 10**9,
+                "end_time": start_time + (i + 1) * 10**9,
+            },
+        )
+
+    rows = await context.database.get_workflows_list(name)
+    assert rows == [
+        {
+            "end_time": utils.get_date_from_ns(start_time + (i + 1) * 10**9),
+            "start_time": utils.get_date_from_ns(start_time + i * 10**9),
+            "status": status,
+            "type": "cwl",
+        }
+        for i, status in ((1, "FAILED"), (0, "COMPLETED"))
+    ]
+    rows = await context.database.get_workflows_list(None)
+    assert {(row["name"], row["type"], row["num"]) for row in rows} >= {
+        (name, "cwl", 2)
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_reports(context: StreamFlowContext):
+    """Test get_reports query"""
+    name = utils.random_name()
+    reports = []
+    for _ in range(2):
+        workflow = Workflow(context=context, type="cwl", name=name, config={})
+        job_port = workflow.create_port(JobPort)
+        step = workflow.create_step(
+            cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+        )
+        await workflow.save(context)
+        executions = []
+        for i in range(2):
+            execution_id = await context.database.add_execution(
+                step.persistent_id, str(i), "echo"
+            )
+            start_time = time.time_ns()
+            await context.database.update_execution(
+                execution_id, {"start_time": start_time, "end_time": start_time + 1}
+            )
+            executions.append(
+                {
+                    "id": execution_id,
+                    "name": step.name,
+                    "start_time": start_time,
+                    "end_time": start_time + 1,
+                }
+            )
+        reports.append(executions)
+
+    # Workflows come newest first, executions in insertion order
+    assert await context.database.get_reports(name) == reports[::-1]
+    assert await context.database.get_reports(name, last_only=True) == [reports[1]]
+
+
+@pytest.mark.asyncio
+async def test_get_port_tokens_queries(context: StreamFlowContext):
+    """Test get_port_tokens and get_port_from_token queries"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    port = workflow.create_port()
+    await workflow.save(context)
+    tokens = [Token(value=utils.random_name()) for _ in range(3)]
+    for token in tokens:
+        await token.save(context, port_id=port.persistent_id)
+
+    assert await context.database.get_port_tokens(port.persistent_id) == [
+        token.persistent_id for token in tokens
+    ]
+    port_row = await context.database.get_port_from_token(tokens[0].persistent_id)
+    assert port_row["id"] == port.persistent_id
+
+
+@pytest.mark.asyncio
+async def test_add_tokens(context: StreamFlowContext):
+    """Test bulk insertion of tokens with add_tokens"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    port = workflow.create_port()
+    await workflow.save(context)
+    values = [utils.random_name() for _ in range(3)]
+    token_ids = await context.database.add_tokens(
+        [
+            (str(i), Token, f'"{value}"', port.persistent_id)
+            for i, value in enumerate(values)
+        ]
+    )
+
+    assert len(token_ids) == len(values)
+    assert await context.database.get_port_tokens(port.persistent_id) == token_ids
+    for i, (token_id, value) in enumerate(zip(token_ids, values)):
+        row = await context.database.get_token(token_id)
+        assert row["tag"] == str(i)
+        assert row["type"] == utils.get_class_fullname(Token)
+        assert row["value"] == f'"{value}"'
+
+
+@pytest.mark.asyncio
+async def test_restore(context: StreamFlowContext):
+    """Test bulk loading of rows with restore"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    port = workflow.create_port()
+    await workflow.save(context)
+    token_id = await context.database.add_token("0", Token, "1", port.persistent_id)
+    await context.database.restore(
+        "token",
+        ("id", "port", "type", "tag", "value"),
+        [
+            (
+                token_id + 100,
+                port.persistent_id,
+                utils.get_class_fullname(Token),
+                "1",
+                "2",
+            )
+        ],
+    )
+
+    assert await context.database.get_port_tokens(port.persistent_id) == [
+        token_id,
+        token_id + 100,
+    ]
+    next_id = await context.database.add_token("2", Token, "3", port.persistent_id)
+    assert next_id > token_id + 100
+
+
+@pytest.mark.asyncio
+async def test_cached_getters_after_update(context: StreamFlowContext):
+    """Test that cached getters do not return stale rows after an update"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    port = workflow.create_port()
+    await workflow.save(context)
+    assert (await context.database.get_workflow(workflow.persistent_id))["name"] == (
+        workflow.name
+    )
+    assert (await context.database.get_port(port.persistent_id))["name"] == port.name
+
+    name = utils.random_name()
+    await context.database.update_workflow(workflow.persistent_id, {"name": name})
+    await context.database.update_port(port.persistent_id, {"name": name})
+    assert (await context.database.get_workflow(workflow.persistent_id))["name"] == name
+    assert (await context.database.get_port(port.persistent_id))["name"] == name
+
+
+@pytest.mark.asyncio
+async def test_update_steps(context: StreamFlowContext):
+    """Test bulk updates of steps with update_steps"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    job_ports = [workflow.create_port(JobPort) for _ in range(3)]
+    steps = [
+        workflow.create_step(
+            cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+        )
+        for job_port in job_ports
+    ]
+    await workflow.save(context)
+    name = utils.random_name()
+    await context.database.update_steps(
+        {
+            steps[0].persistent_id: {"status": Status.COMPLETED.value},
+            steps[1].persistent_id: {"status": Status.FAILED.value},
+            steps[2].persistent_id: {"name": name, "status": Status.SKIPPED.value},
+        }
+    )
+
+    rows = [await context.database.get_step(step.persistent_id) for step in steps]
+    assert [row["status"] for row in rows] == [
+        Status.COMPLETED.value,
+        Status.FAILED.value,
+        Status.SKIPPED.value,
+    ]
+    assert rows[2]["name"] == name
+
+
+@pytest.mark.asyncio
+async def test_update_ports(context: StreamFlowContext):
+    """Test bulk updates of ports with update_ports"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    ports = [workflow.create_port() for _ in range(2)]
+    await workflow.save(context)
+    # Populate the cache, which the update must evict
+    for port in ports:
+        assert (await context.database.get_port(port.persistent_id))["name"] == (
+            port.name
+        )
+    names = [utils.random_name() for _ in ports]
+    await context.database.update_ports(
+        {port.persistent_id: {"name": name} for port, name in zip(ports, names)}
+    )
+
+    for port, name in zip(ports, names):
+        assert (await context.database.get_port(port.persistent_id))["name"] == name
+
+
+@pytest.mark.asyncio
+async def test_add_dependencies(context: StreamFlowContext):
+    """Test bulk insertion of step dependencies with add_dependencies"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    ports = [workflow.create_port() for _ in range(3)]
+    job_port = workflow.create_port(JobPort)
+    step = workflow.create_step(
+        cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+    )
+    await workflow.save(context)
+    await context.database.get_input_ports(step.persistent_id)
+    await context.database.add_dependencies(
+        step.persistent_id,
+        [
+            (ports[0].persistent_id, DependencyType.INPUT, "in"),
+            (ports[1].persistent_id, DependencyType.INPUT, "in2"),
+            (ports[2].persistent_id, DependencyType.OUTPUT, "out"),
+        ],
+    )
+
+    input_ports = {
+        row["name"]: row["port"]
+        for row in await context.database.get_input_ports(step.persistent_id)
+    }
+    assert input_ports["in"] == ports[0].persistent_id
+    assert input_ports["in2"] == ports[1].persistent_id
+    output_ports = await context.database.get_output_ports(step.persistent_id)
+    assert [(row["name"], row["port"]) for row in output_ports] == [
+        ("out", ports[2].persistent_id)
+    ]
+    input_steps = await context.database.get_input_steps(ports[2].persistent_id)
+    assert [row["step"] for row in input_steps] == [step.persistent_id]
+
+
+@pytest.mark.asyncio
+async def test_get_ports_by_step(context: StreamFlowContext):
+    """Test get_ports_by_step query"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    ports = [workflow.create_port() for _ in range(2)]
+    job_port = workflow.create_port(JobPort)
+    step = workflow.create_step(
+        cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+    )
+    step.add_input_port("in", ports[0])
+    step.add_output_port("out", ports[1])
+    await workflow.save(context)
+
+    step_ports = await context.database.get_ports_by_step(step.persistent_id)
+    assert ports[0].persistent_id in {
+        row["port"] for row in step_ports[DependencyType.INPUT]
+    }
+    assert [row["port"] for row in step_ports[DependencyType.OUTPUT]] == [
+        ports[1].persistent_id
+    ]
+    assert step_ports[DependencyType.INPUT] == await context.database.get_input_ports(
+        step.persistent_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_add_ports_and_steps(context: StreamFlowContext):
+    """Test bulk insertion of ports and steps with add_ports and add_steps"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    await workflow.save(context)
+    names = [utils.random_name() for _ in range(3)]
+    port_ids = await context.database.add_ports(
+        [(name, workflow.persistent_id, JobPort, {}) for name in names]
+    )
+    step_ids = await context.database.add_steps(
+        [
+            (name, workflow.persistent_id, Status.WAITING.value, ExecuteStep, {})
+            for name in names
+        ]
+    )
+
+    assert len(port_ids) == len(step_ids) == len(names)
+    for port_id, step_id, name in zip(port_ids, step_ids, names):
+        assert (await context.database.get_port(port_id))["name"] == name
+        step_row = await context.database.get_step(step_id)
+        assert step_row["name"] == name
+        assert step_row["type"] == utils.get_class_fullname(ExecuteStep)
+
+
+@pytest.mark.asyncio
+async def test_add_executions(context: StreamFlowContext):
+    """Test bulk insertion of executions with add_executions"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    job_port = workflow.create_port(JobPort)
+    step = workflow.create_step(
+        cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+    )
+    await workflow.save(context)
+    # Each returned id must point to the row built from the same input entry
+    tags = [str(i) for i in reversed(range(100))]
+    execution_ids = await context.database.add_executions(
+        [(step.persistent_id, tag, f"echo {tag}") for tag in tags]
+    )
+
+    assert len(execution_ids) == len(tags)
+    for execution_id, tag in zip(execution_ids, tags):
+        row = await context.database.get_execution(execution_id)
+        assert row["step"] == step.persistent_id
+        assert row["tag"] == tag
+        assert row["cmd"] == f"echo {tag}"
+
+
+@pytest.mark.asyncio
+async def test_get_provenance(context: StreamFlowContext):
+    """Test get_provenance query"""
+    token_ids = await context.database.add_tokens(
+        [(str(i), Token, str(i), None) for i in range(3)]
+    )
+    await context.database.add_provenance([token_ids[0]], token_ids[1])
+    await context.database.add_provenance([token_ids[1]], token_ids[2])
+
+    dependee_rows, depender_rows = await context.database.get_provenance(token_ids[1])
+    assert [row["dependee"] for row in dependee_rows] == [token_ids[0]]
+    assert [row["depender"] for row in depender_rows] == [token_ids[2]]
+    assert dependee_rows == await context.database.get_dependees(token_ids[1])
+    assert depender_rows == await context.database.get_dependers(token_ids[1])
+
+
+@pytest.mark.asyncio
+async def test_batch_getters(context: StreamFlowContext):
+    """Test get_ports, get_steps and get_tokens batch queries"""
+    workflow = Workflow(
+        context=context, type="cwl", name=utils.random_name(), config={}
+    )
+    ports = [workflow.create_port() for _ in range(2)]
+    job_port = workflow.create_port(JobPort)
+    step = workflow.create_step(
+        cls=ExecuteStep, name=utils.random_name(), job_port=job_port
+    )
+    await workflow.save(context)
+    token_ids = await context.database.add_tokens(
+        [(str(i), Token, str(i), ports[0].persistent_id) for i in range(3)]
+    )
+    # Cached and uncached rows must be returned alike
+    await context.database.get_port(ports[0].persistent_id)
+    await context.database.get_token(token_ids[0])
+
+    port_rows = await context.database.get_ports([p.persistent_id for p in ports])
+    assert {k: v["name"] for k, v in port_rows.items()} == {
+        p.persistent_id: p.name for p in ports
+    }
+    step_rows = await context.database.get_steps([step.persistent_id])
+    assert step_rows[step.persistent_id]["name"] == step.name
+    token_rows = await context.database.get_tokens(token_ids)
+    assert [token_rows[token_id]["tag"] for token_id in token_ids] == ["0", "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_non_finite_params(context: StreamFlowContext):
+    """Test that non-finite floats in params survive a round trip"""
+    workflow_id = await context.database.add_workflow(
+        utils.random_name(),
+        {"nan": float("nan"), "inf": float("inf"), "none": None},
+        Status.WAITING.value,
+        "cwl",
+    )
+
+    params = json.loads((await context.database.get_workflow(workflow_id))["params"])
+    assert math.isnan(params["nan"])
+    assert params["inf"] == float("inf")
+    assert params["none"] is None
+
+
+@pytest.mark.asyncio
+async def test_prepared_statement_invalidation(context: StreamFlowContext):
+    """Test that cached statements are prepared again after a schema change"""
+    async with (await context.database.pool.connect()).acquire() as conn:
+        await conn.execute("CREATE TEMPORARY TABLE statement_test (value INTEGER)")
+        try:
+            await conn.execute("INSERT INTO statement_test VALUES (1)")
+            assert await conn.fetchval("SELECT value FROM statement_test") == 1
+            await conn.execute(
+                "ALTER TABLE statement_test ALTER COLUMN value TYPE TEXT"
+            )
+            assert await conn.fetchval("SELECT value FROM statement_test") == "1"
+        finally:
+            await conn.execute("DROP TABLE statement_test")
+
+
+@pytest.mark.asyncio
+async def test_unprepared_statements(context: StreamFlowContext):
+    """Test that a zero statementCacheSize disables named prepared statements"""
+    database = _create_database(
+        context, minConnections=1, maxConnections=1, statementCacheSize=0
+    )
+    try:
+        workflow_id = await database.add_workflow(
+            utils.random_name(), {}, Status.WAITING.value, "cwl"
+        )
+        assert (await database.get_workflow(workflow_id))["id"] == workflow_id
+        async with (await database.pool.connect()).acquire() as conn:
+            assert (
+                await conn.fetchval("SELECT count(*) FROM pg_prepared_statements") == 0
+            )
+    finally:
+        await database.close()
+
+
+@pytest.mark.asyncio
+async def test_reacquired_connection(context: StreamFlowContext):
+    """Test that cached statements survive the release of a pooled connection"""
+    database = _create_database(context, minConnections=1, maxConnections=1)
+    try:
+        name = utils.random_name()
+        workflow_id = await database.add_workflow(name, {}, Status.WAITING.value, "cwl")
+        for _ in range(2):
+            rows = await database.get_workflows_by_name(name)
+            assert [row["id"] for row in rows] == [workflow_id]
+    finally:
+        await database.close()
+
+
+@pytest.mark.asyncio
+async def test_schema_digest(context: StreamFlowContext):
+    """Test that the schema DDL only runs when its digest changes"""
+    pool = context.database.pool
+    query = "SELECT obj_description(to_regclass('workflow'), 'pg_class')"
+    async with (await pool.connect()).acquire() as conn:
+        # An up-to-date digest skips the DDL
+        await conn.execute("DROP INDEX token_port")
+        await pool._create_schema(conn)
+        assert await conn.fetchval("SELECT to_regclass('token_port')") is None
+        # A stale digest applies the DDL again and stamps the current digest
+        await conn.execute("COMMENT ON TABLE workflow IS 'stale'")
+        await pool._create_schema(conn)
+        assert await conn.fetchval("SELECT to_regclass('token_port')") is not None
+        assert await conn.fetchval(query) == _SCHEMA_DIGEST
+
+
+@pytest.mark.asyncio
+async def test_schema_digest_not_owner(context: StreamFlowContext):
+    """Test that a role which does not own the tables skips the migration"""
+    pool = context.database.pool
+    query = "SELECT obj_description(to_regclass('workflow'), 'pg_class')"
+    async with (await pool.connect()).acquire() as conn:
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            try:
+                await conn.execute("CREATE ROLE streamflow_test_reader")
+            except asyncpg.InsufficientPrivilegeError:
+                pytest.skip("The test user cannot create roles")
+            await conn.execute("COMMENT ON TABLE workflow IS 'stale'")
+            await conn.execute("SET LOCAL ROLE streamflow_test_reader")
+            await pool._create_schema(conn)
+            assert await conn.fetchval(query) == "stale"
+        finally:
+            await transaction.rollback()
+
+
+@pytest.mark.asyncio
+async def test_shared_pool(context: StreamFlowContext):
+    """Test that databases with the same configuration share a refcounted pool"""
+    databases = [_create_database(context, minConnections=1) for _ in range(2)]
+    pool = databases[0].pool
+    assert databases[1].pool is pool
+    assert pool is not context.database.pool
+    asyncpg_pool = await pool.connect()
+
+    # Closing a database twice releases a single reference
+    await databases[0].close()
+    await databases[0].close()
+    assert PostgreSQLConnectionPool._pools[pool._key] is pool
+    assert await pool.connect() is asyncpg_pool
+    assert await databases[1].get_workflows_list(None) is not None
+
+    await databases[1].close()
+    assert pool._key not in PostgreSQLConnectionPool._pools
+    assert asyncpg_pool.is_closing()
+
+
+@pytest.mark.asyncio
+async def test_shared_pool_event_loop(context: StreamFlowContext):
+    """Test that pools are not shared with databases of a closed event loop"""
+
+    async def _get_pool() -> PostgreSQLConnectionPool:
+        return _create_database(context, minConnections=1).pool
+
+    # Create a database in another event loop and never close it
+    stale_pool = await asyncio.get_running_loop().run_in_executor(
+        None, asyncio.run, _get_pool()
+    )
+    assert stale_pool.password not in stale_pool._key
+    database = _create_database(context, minConnections=1)
+    try:
+        assert database.pool is not stale_pool
+        assert stale_pool._key not in PostgreSQLConnectionPool._pools
+        assert await database.get_workflows_list(None) is not None
+    finally:
+        await database.close()